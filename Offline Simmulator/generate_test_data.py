@@ -1,10 +1,63 @@
-import json
-import random
 import time
 import os
+import sys
 import argparse
 
-def generate_orderbook_data(base_price=50000.0, spread=10.0, depth=20, vol_factor=1.0):
+import numpy as np
+
+try:
+    import _fastjson
+except ImportError:
+    # Run from this directory: the shared JSON helper lives in the repo root
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+    import _fastjson
+
+# Shared PCG64 generator for vectorized sampling
+RNG = np.random.default_rng()
+
+# Samples generated per vectorized batch; bounds memory while streaming
+BLOCK_SIZE = 1024
+
+# Levels per side in generated orderbooks
+DEFAULT_DEPTH = 20
+
+def _level_multipliers(depth):
+    """Per-level ask price, bid price and volume multipliers for the given depth"""
+    levels = np.arange(depth)
+    step_up = 1 + levels * 0.0002  # 0.02% steps
+    step_down = 1 - levels * 0.0002
+    vol_decay = 1 / (1 + levels * 0.1)  # Decreasing volume with distance
+    return step_up, step_down, vol_decay
+
+# The ladder only depends on depth, so build it once for the default
+_DEFAULT_MULTIPLIERS = _level_multipliers(DEFAULT_DEPTH)
+
+def _generate_levels(base_prices, spreads, depth, vol_factors, rng):
+    """
+    Generate ask/bid levels for a batch of orderbooks at once
+    
+    Returns:
+        tuple: ask_px, ask_qty, bid_px, bid_qty arrays of shape [len(base_prices), depth]
+    """
+    if depth == DEFAULT_DEPTH:
+        step_up, step_down, vol_decay = _DEFAULT_MULTIPLIERS
+    else:
+        step_up, step_down, vol_decay = _level_multipliers(depth)
+    n = len(base_prices)
+    
+    # Generate asks
+    ask_start = base_prices + spreads / 2
+    ask_px = ask_start[:, None] * step_up
+    ask_qty = rng.uniform(0.5, 5.0, (n, depth)) * vol_factors[:, None] * vol_decay
+    
+    # Generate bids
+    bid_start = base_prices - spreads / 2
+    bid_px = bid_start[:, None] * step_down
+    bid_qty = rng.uniform(0.5, 5.0, (n, depth)) * vol_factors[:, None] * vol_decay
+    
+    return ask_px, ask_qty, bid_px, bid_qty
+
+def generate_orderbook_data(base_price=50000.0, spread=10.0, depth=DEFAULT_DEPTH, vol_factor=1.0, rng=RNG):
     """
     Generate realistic orderbook data
     
@@ -13,80 +66,105 @@ def generate_orderbook_data(base_price=50000.0, spread=10.0, depth=20, vol_facto
         spread (float): Spread between best bid and ask
         depth (int): Number of levels on each side
         vol_factor (float): Volume factor to scale quantities
+        rng (np.random.Generator): Random generator to draw quantities from
         
     Returns:
-        dict: Orderbook data with asks and bids
+        dict: Orderbook data with asks and bids as [price, qty] float pairs
     """
-    # Generate asks
-    asks = []
-    ask_start = base_price + spread / 2
-    for i in range(depth):
-        price = ask_start + i * (ask_start * 0.0002)  # 0.02% steps
-        qty = random.uniform(0.5, 5.0) * vol_factor / (1 + i * 0.1)  # Decreasing volume with distance
-        asks.append([str(price), str(qty)])
-    
-    # Generate bids
-    bids = []
-    bid_start = base_price - spread / 2
-    for i in range(depth):
-        price = bid_start - i * (bid_start * 0.0002)  # 0.02% steps
-        qty = random.uniform(0.5, 5.0) * vol_factor / (1 + i * 0.1)  # Decreasing volume with distance
-        bids.append([str(price), str(qty)])
+    ask_px, ask_qty, bid_px, bid_qty = _generate_levels(
+        np.array([base_price]), np.array([spread]), depth, np.array([vol_factor]), rng)
     
     return {
-        "asks": asks,
-        "bids": bids,
+        "asks": np.column_stack((ask_px[0], ask_qty[0])).tolist(),
+        "bids": np.column_stack((bid_px[0], bid_qty[0])).tolist(),
         "timestamp": int(time.time() * 1000)
     }
 
-def generate_test_data_file(num_samples=100, filename="test_data.json", volatility=0.001):
+def generate_samples(num_samples=100, volatility=0.001, rng=RNG):
     """
-    Generate a series of orderbook updates and save to a file
+    Lazily generate a series of orderbook updates following a random walk
     
     Args:
         num_samples (int): Number of orderbook samples to generate
-        filename (str): Output filename
         volatility (float): Price volatility between samples
+        rng (np.random.Generator): Random generator for all draws
+        
+    Yields:
+        dict: Orderbook data with asks and bids
     """
-    samples = []
-    current_price = 50000.0  # Starting price
+    depth = DEFAULT_DEPTH
     
-    for i in range(num_samples):
-        # Random walk the price
-        price_change = current_price * random.uniform(-volatility, volatility)
-        current_price += price_change
-        
-        # Generate orderbook
-        data = generate_orderbook_data(base_price=current_price, 
-                                      spread=current_price * 0.0002,  # 0.02% spread
-                                      depth=20,
-                                      vol_factor=1.0 + random.uniform(-0.2, 0.2))  # Volume fluctuations
-        
-        # Add some empty or zero volume entries randomly
-        if random.random() < 0.1:  # 10% chance
-            idx = random.randint(0, len(data["asks"]) - 1)
-            data["asks"][idx][1] = "0"
+    # Random walk the price: one vectorized draw and a cumulative product
+    steps = 1.0 + rng.uniform(-volatility, volatility, num_samples)
+    prices = 50000.0 * np.cumprod(steps)  # Starting price 50000
+    vol_factors = 1.0 + rng.uniform(-0.2, 0.2, num_samples)  # Volume fluctuations
+    
+    for start in range(0, num_samples, BLOCK_SIZE):
+        block_prices = prices[start:start + BLOCK_SIZE]
+        n = len(block_prices)
         
-        if random.random() < 0.1:  # 10% chance
-            idx = random.randint(0, len(data["bids"]) - 1)
-            data["bids"][idx][1] = "0"
+        # Generate orderbooks
+        ask_px, ask_qty, bid_px, bid_qty = _generate_levels(
+            block_prices, block_prices * 0.0002,  # 0.02% spread
+            depth, vol_factors[start:start + BLOCK_SIZE], rng)
         
-        samples.append(data)
+        # Add some empty or zero volume entries randomly (10% chance per side),
+        # as one fancy-indexed assignment per side
+        for qty in (ask_qty, bid_qty):
+            rows = np.flatnonzero(rng.random(n) < 0.1)
+            qty[rows, rng.integers(0, depth, len(rows))] = 0.0
         
+        asks = np.stack((ask_px, ask_qty), axis=-1).tolist()
+        bids = np.stack((bid_px, bid_qty), axis=-1).tolist()
+        timestamp = int(time.time() * 1000)
+        for sample_asks, sample_bids in zip(asks, bids):
+            yield {
+                "asks": sample_asks,
+                "bids": sample_bids,
+                "timestamp": timestamp
+            }
+
+def generate_test_data_file(num_samples=100, filename="test_data.json", volatility=0.001, pretty=False, seed=None):
+    """
+    Generate a series of orderbook updates and save to a file
+    
+    Samples are streamed to disk as JSON lines (one compact object per line),
+    so memory use stays flat regardless of num_samples.
+    
+    Args:
+        num_samples (int): Number of orderbook samples to generate
+        filename (str): Output filename
+        volatility (float): Price volatility between samples
+        pretty (bool): Write a single indented JSON array for human reading
+            instead (built in memory, slower, larger file)
+        seed (int): Seed for reproducible output; None draws fresh entropy
+    """
+    rng = RNG if seed is None else np.random.default_rng(seed)
+    samples = generate_samples(num_samples, volatility, rng)
+    
     # Save to file
-    with open(filename, 'w') as f:
-        json.dump(samples, f, indent=2)
+    with open(filename, 'wb') as f:
+        if pretty:
+            f.write(_fastjson.dumps(list(samples), pretty=True))
+        else:
+            for data in samples:
+                f.write(_fastjson.dumps(data))
+                f.write(b'\n')
     
     print(f"Generated {num_samples} orderbook samples and saved to {filename}")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate test orderbook data")
     parser.add_argument("--samples", type=int, default=100, help="Number of samples to generate")
-    parser.add_argument("--output", type=str, default="test_data.json", help="Output filename")
+    parser.add_argument("--output", type=str, default="test_data.json", help="Output filename (written as JSON lines unless --pretty is given)")
     parser.add_argument("--volatility", type=float, default=0.001, help="Price volatility between samples")
+    parser.add_argument("--pretty", action="store_true", help="Write indented, human-readable JSON")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible data")
     
     args = parser.parse_args()
     
     generate_test_data_file(num_samples=args.samples, 
                            filename=args.output,
-                           volatility=args.volatility) 
\ No newline at end of file
+                           volatility=args.volatility,
+                           pretty=args.pretty,
+                           seed=args.seed) 
\ No newline at end of file
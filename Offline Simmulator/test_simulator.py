@@ -1,7 +1,16 @@
 import unittest
 import asyncio
+import os
+import tempfile
+import time
+import numpy as np
 import config
-from trade_simulator import OrderBook, almgren_chriss_impact, linear_slippage_estimate, fee_estimate, maker_taker_proportion
+import _fastjson
+from trade_simulator import (OrderBook, LatencyBuffer, almgren_chriss_impact, linear_slippage_estimate, fee_estimate, maker_taker_proportion,
+                             almgren_chriss_impact_vec, linear_slippage_estimate_vec, maker_taker_proportion_vec,
+                             compute_trade_metrics, reload_config, OKXWebSocketClient)
+from offline_simulator import OfflineDataSimulator
+from generate_test_data import generate_test_data_file, generate_samples, BLOCK_SIZE, DEFAULT_DEPTH
 
 class TestTradeSimulator(unittest.TestCase):
     def setUp(self):
@@ -32,6 +41,91 @@ class TestTradeSimulator(unittest.TestCase):
         self.assertEqual(len(self.orderbook.bids), 2)
         self.assertNotIn(49800.0, self.orderbook.bids)
     
+    def test_orderbook_update_rejects_malformed_message(self):
+        self.orderbook.update(self.sample_asks, self.sample_bids)
+        
+        # A bad row rejects the whole message rather than applying part of it
+        with self.assertRaises(ValueError):
+            self.orderbook.update([["50000.0", "0"], ["bad", "1.0"]], [])
+        self.assertEqual(self.orderbook.asks[50000.0], 1.5)
+        self.assertEqual(len(self.orderbook.asks), 3)
+    
+    def test_orderbook_update_extra_fields(self):
+        # OKX rows carry extra per-level fields after price and quantity
+        self.orderbook.update([["50000.0", "1.5", "0", "4"]], [["49900.0", "2.5", "0", "2"]])
+        
+        self.assertEqual(self.orderbook.asks[50000.0], 1.5)
+        self.assertEqual(self.orderbook.bids[49900.0], 2.5)
+    
+    def test_orderbook_empty_update(self):
+        self.orderbook.update(self.sample_asks, self.sample_bids)
+        seq = self.orderbook.seq
+        
+        # An empty delta changes nothing but still counts as fresh data
+        self.orderbook.update([], [])
+        self.assertEqual(self.orderbook.seq, seq)
+        self.assertEqual(self.orderbook.get_best_ask(), 50000.0)
+        self.assertFalse(self.orderbook.is_stale())
+    
+    def test_orderbook_update_levels(self):
+        self.orderbook.update_levels([(50000.0, 1.5), (50100.0, 2.0)], [(49900.0, 2.5)])
+        self.assertEqual(self.orderbook.asks[50100.0], 2.0)
+        self.assertEqual(self.orderbook.get_best_bid(), 49900.0)
+        
+        # Zero quantity removes the level; an empty call only refreshes the timestamp
+        self.orderbook.update_levels({50000.0: 0.0}.items(), {}.items())
+        self.assertNotIn(50000.0, self.orderbook.asks)
+        seq = self.orderbook.seq
+        self.orderbook.update_levels([], [])
+        self.assertEqual(self.orderbook.seq, seq)
+        self.assertFalse(self.orderbook.is_stale())
+    
+    def test_orderbook_update_arrays(self):
+        self.orderbook.update_arrays(
+            np.array([50000.0, 50100.0]), np.array([1.5, 2.0]),
+            np.array([49900.0, 49800.0]), np.array([2.5, 3.0])
+        )
+        self.assertEqual(self.orderbook.asks[50000.0], 1.5)
+        self.assertEqual(self.orderbook.bids[49800.0], 3.0)
+        
+        # Zero quantity removes the level
+        self.orderbook.update_arrays(np.array([50000.0]), np.array([0.0]), np.array([]), np.array([]))
+        self.assertNotIn(50000.0, self.orderbook.asks)
+        self.assertEqual(len(self.orderbook.bids), 2)
+    
+    def test_message_batch_applied_once(self):
+        self.orderbook.update(self.sample_asks, self.sample_bids)
+        seq = self.orderbook.seq
+        client = OKXWebSocketClient("ws://localhost", self.orderbook)
+        try:
+            client._parse_and_apply([
+                '{"asks": [["49990.0", "1.0"]], "bids": []}',
+                'not json',
+                '{"asks": [["49990.0", "0"], ["50000.0", "3.0"]], "bids": [["49900.0", "4.0"]]}',
+            ])
+        finally:
+            client.shutdown()
+        
+        # Only the latest quantity per level is applied, in a single orderbook update
+        self.assertEqual(self.orderbook.seq, seq + 1)
+        self.assertNotIn(49990.0, self.orderbook.asks)
+        self.assertEqual(self.orderbook.asks[50000.0], 3.0)
+        self.assertEqual(self.orderbook.bids[49900.0], 4.0)
+        self.assertEqual(len(client.latency), 1)
+    
+    def test_reconnect_backoff(self):
+        client = OKXWebSocketClient("ws://localhost", self.orderbook)
+        client.shutdown()
+        
+        delays = []
+        for attempt in range(1, 30):
+            client.reconnect_attempts = attempt
+            delays.append(client._reconnect_delay())
+        
+        self.assertEqual(delays[0], config.INITIAL_RECONNECT_DELAY)
+        self.assertEqual(delays, sorted(delays))
+        self.assertEqual(delays[-1], config.MAX_RECONNECT_DELAY)
+    
     def test_best_prices(self):
         self.orderbook.update(self.sample_asks, self.sample_bids)
         
@@ -43,6 +137,11 @@ class TestTradeSimulator(unittest.TestCase):
         
         # Check mid price
         self.assertEqual(self.orderbook.get_mid_price(), 49950.0)
+        
+        # Snapshot agrees with the individual getters
+        best_bid, best_ask, mid_price, update_time = self.orderbook.get_top_of_book()
+        self.assertEqual((best_bid, best_ask, mid_price), (49900.0, 50000.0, 49950.0))
+        self.assertEqual(update_time, self.orderbook.last_update_time)
     
     def test_almgren_chriss_impact(self):
         order_size = 100.0
@@ -90,6 +189,211 @@ class TestTradeSimulator(unittest.TestCase):
         # Test extreme values
         self.assertLess(maker_taker_proportion(1.0), 0.5)  # Should be closer to 0
         self.assertGreater(maker_taker_proportion(1000.0), 0.5)  # Should be closer to 1
+        
+        # NaN propagates rather than tripping the error fallback
+        self.assertTrue(math.isnan(maker_taker_proportion(float('nan'))))
+
+    def test_compute_trade_metrics(self):
+        order_size = 120.0
+        volatility = 0.3
+        fee_tier = 0.002
+        
+        slippage, fees, impact, net_cost, maker_taker = compute_trade_metrics(order_size, volatility, fee_tier)
+        self.assertAlmostEqual(slippage, linear_slippage_estimate(order_size, volatility))
+        self.assertAlmostEqual(fees, fee_estimate(order_size, fee_tier))
+        self.assertAlmostEqual(impact, almgren_chriss_impact(order_size, volatility))
+        self.assertAlmostEqual(net_cost, slippage + fees + impact)
+        self.assertAlmostEqual(maker_taker, maker_taker_proportion(order_size))
+        
+        # Falls back to the configured fee tier
+        self.assertAlmostEqual(compute_trade_metrics(order_size, volatility)[1], fee_estimate(order_size))
+        
+        # Out-of-range input never raises (exp overflows as plain Python, not under numba)
+        slippage, fees, impact, net_cost, maker_taker = compute_trade_metrics(-1e6, volatility, fee_tier)
+        self.assertAlmostEqual(slippage, linear_slippage_estimate(-1e6, volatility))
+        self.assertAlmostEqual(net_cost, slippage + fees + impact)
+        self.assertTrue(0.0 <= maker_taker <= 1.0)
+        self.assertEqual(len(compute_trade_metrics(float('nan'), volatility, fee_tier)), 5)
+        
+        # Impact honours the time horizon like the standalone model
+        self.assertAlmostEqual(compute_trade_metrics(order_size, volatility, fee_tier, time_horizon=2.5)[2],
+                               almgren_chriss_impact(order_size, volatility, time_horizon=2.5))
+    
+    def test_reload_config(self):
+        original_gamma = config.IMPACT_GAMMA
+        try:
+            config.IMPACT_GAMMA = original_gamma * 2
+            reload_config()
+            expected_impact = config.IMPACT_GAMMA * 100.0 + config.IMPACT_ETA * 100.0 * 0.3
+            self.assertAlmostEqual(almgren_chriss_impact(100.0, 0.3), expected_impact)
+        finally:
+            config.IMPACT_GAMMA = original_gamma
+            reload_config()
+    
+    def test_vectorized_models(self):
+        sizes = np.array([1.0, 50.0, 200.0, 1000.0])
+        volatility = 0.3
+        
+        # Vectorized curves must match the scalar models point by point
+        impact = almgren_chriss_impact_vec(sizes, volatility)
+        slippage = linear_slippage_estimate_vec(sizes, volatility)
+        proportion = maker_taker_proportion_vec(sizes)
+        for i, size in enumerate(sizes):
+            self.assertAlmostEqual(impact[i], almgren_chriss_impact(size, volatility))
+            self.assertAlmostEqual(slippage[i], linear_slippage_estimate(size, volatility))
+            self.assertAlmostEqual(proportion[i], maker_taker_proportion(size))
+    
+    def test_fastjson_roundtrip(self):
+        sample = {"asks": [[50000.5, 1.25]], "bids": [[49999.5, 0.0]], "timestamp": 1}
+        
+        # dumps always returns bytes, whichever backend is installed
+        for pretty in (False, True):
+            encoded = _fastjson.dumps(sample, pretty=pretty)
+            self.assertIsInstance(encoded, bytes)
+            self.assertEqual(_fastjson.loads(encoded), sample)
+        
+        with self.assertRaises(_fastjson.JSONDecodeError):
+            _fastjson.loads(b"{not json")
+    
+    def _temp_path(self, name):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        return os.path.join(tmpdir.name, name)
+    
+    def test_generate_samples(self):
+        n = BLOCK_SIZE + 3  # crosses a block boundary
+        samples = list(generate_samples(n, rng=np.random.default_rng(11)))
+        self.assertEqual(len(samples), n)
+        
+        for sample in samples:
+            for side in ("asks", "bids"):
+                self.assertEqual(len(sample[side]), DEFAULT_DEPTH)
+                self.assertTrue(all(isinstance(price, float) and isinstance(qty, float)
+                                    for price, qty in sample[side]))
+        
+        # Some levels get zeroed quantities
+        self.assertTrue(any(qty == 0.0 for sample in samples for _, qty in sample["asks"]))
+        self.assertTrue(any(qty == 0.0 for sample in samples for _, qty in sample["bids"]))
+        
+        # A fixed seed reproduces the same levels
+        again = list(generate_samples(n, rng=np.random.default_rng(11)))
+        self.assertEqual([(s["asks"], s["bids"]) for s in samples],
+                         [(s["asks"], s["bids"]) for s in again])
+        
+        # ...and so does the file writer's seed argument
+        loaded = []
+        for name in ("a.json", "b.json"):
+            path = self._temp_path(name)
+            generate_test_data_file(num_samples=10, filename=path, seed=11)
+            simulator = OfflineDataSimulator(OrderBook(), path)
+            self.assertTrue(simulator.load_data())
+            loaded.append(simulator)
+        np.testing.assert_array_equal(loaded[0].ask_qty, loaded[1].ask_qty)
+        np.testing.assert_array_equal(loaded[0].bid_px, loaded[1].bid_px)
+    
+    def test_test_data_roundtrip(self):
+        # JSON lines by default, a single indented array with pretty; the loader reads both
+        for pretty in (False, True):
+            path = self._temp_path("test_data.json")
+            generate_test_data_file(num_samples=25, filename=path, pretty=pretty, seed=7)
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(1) == b'[', pretty)
+            
+            simulator = OfflineDataSimulator(OrderBook(), path)
+            self.assertTrue(simulator.load_data())
+            self.assertEqual(simulator.num_samples, 25)
+            self.assertEqual(simulator.ask_px.shape, simulator.bid_qty.shape)
+    
+    def test_load_data_legacy_array(self):
+        path = self._temp_path("legacy.json")
+        samples = [{"asks": [[50000.0, 1.0]], "bids": [[49900.0, 2.0]]},
+                   {"asks": [[50010.0, 1.5]], "bids": [[49890.0, 2.5]]}]
+        with open(path, 'wb') as f:
+            f.write(b"\n  " + _fastjson.dumps(samples))
+        
+        simulator = OfflineDataSimulator(OrderBook(), path)
+        self.assertTrue(simulator.load_data())
+        self.assertEqual(simulator.num_samples, 2)
+        self.assertEqual(simulator.ask_px[1, 0], 50010.0)
+        self.assertEqual(simulator.bid_qty[0, 0], 2.0)
+    
+    def test_padded_rows_replay_cleanly(self):
+        path = self._temp_path("ragged.json")
+        samples = [{"asks": [[50000.0, 1.0], [50010.0, 2.0], [50020.0, 3.0]], "bids": [[49900.0, 1.0]]},
+                   {"asks": [[50000.0, 4.0]], "bids": [[49900.0, 5.0], [49890.0, 6.0]]}]
+        with open(path, 'wb') as f:
+            for sample in samples:
+                f.write(_fastjson.dumps(sample) + b"\n")
+        simulator = OfflineDataSimulator(OrderBook(), path)
+        self.assertTrue(simulator.load_data())
+        self.assertEqual(simulator.ask_px.shape, (2, 3))
+        self.assertEqual(simulator.bid_px.shape, (2, 2))
+        
+        # Replay both rows, the second padded on the ask side, the first on the bid side
+        book = simulator.orderbook
+        for i in range(2):
+            book.update_arrays(simulator.ask_px[i], simulator.ask_qty[i],
+                               simulator.bid_px[i], simulator.bid_qty[i])
+        
+        self.assertFalse(any(np.isnan(price) for price in book.asks))
+        self.assertFalse(any(np.isnan(price) for price in book.bids))
+        self.assertEqual(dict(book.asks), {50000.0: 4.0, 50010.0: 2.0, 50020.0: 3.0})
+        self.assertEqual(dict(book.bids), {49900.0: 5.0, 49890.0: 6.0})
+    
+    def test_load_data_rejects_empty_file(self):
+        path = self._temp_path("empty.json")
+        open(path, 'wb').close()
+        
+        simulator = OfflineDataSimulator(OrderBook(), path)
+        self.assertFalse(simulator.load_data())
+        self.assertFalse(simulator.start())
+    
+    def test_headless_replay_keeps_only_latest_progress(self):
+        path = self._temp_path("test_data.json")
+        generate_test_data_file(num_samples=50, filename=path, seed=3)
+        simulator = OfflineDataSimulator(OrderBook(), path, replay_speed=1000)
+        self.assertTrue(simulator.start())
+        try:
+            time.sleep(0.2)
+        finally:
+            simulator.stop()
+        time.sleep(0.05)  # let the cancellation reach the replay loop
+        
+        # Nothing drains the queue without a UI; it holds just the newest position
+        self.assertEqual(simulator.progress_queue.qsize(), 1)
+        self.assertGreater(simulator.progress_queue.get_nowait(), 0)
+    
+    def test_restart_after_stop(self):
+        path = self._temp_path("test_data.json")
+        generate_test_data_file(num_samples=20, filename=path, seed=5)
+        simulator = OfflineDataSimulator(OrderBook(), path, replay_speed=1000)
+        
+        self.assertTrue(simulator.start())
+        first_loop = simulator._loop
+        simulator.stop()
+        self.assertTrue(simulator.start())
+        time.sleep(0.1)  # the first replay thread winds down meanwhile
+        
+        # The old thread closes only its own loop; the new replay keeps running
+        self.assertTrue(first_loop.is_closed())
+        self.assertFalse(simulator._loop.is_closed())
+        self.assertFalse(simulator._replay_task.done())
+        simulator.stop()
+        time.sleep(0.05)
+        simulator.stop()  # stopping after the loop has closed is harmless
+    
+    def test_latency_buffer(self):
+        buf = LatencyBuffer(size=3)
+        self.assertEqual(buf.mean(), 0)
+        
+        for value in [1.0, 2.0, 3.0]:
+            buf.append(value)
+        self.assertAlmostEqual(buf.mean(), 2.0)
+        
+        # Oldest sample is evicted once the buffer is full
+        buf.append(7.0)
+        self.assertEqual(len(buf), 3)
+        self.assertAlmostEqual(buf.mean(), 4.0)
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
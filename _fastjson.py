@@ -0,0 +1,38 @@
+"""
+Fastest available JSON codec: orjson, then ujson, then the stdlib json module.
+
+dumps() always returns bytes and loads() accepts str or bytes, so callers can
+use binary file IO the same way whichever backend is installed.
+"""
+try:
+    import orjson
+
+    BACKEND = "orjson"
+    JSONDecodeError = orjson.JSONDecodeError
+    loads = orjson.loads
+
+    def dumps(obj, pretty=False):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+
+except ImportError:
+    try:
+        import ujson
+
+        BACKEND = "ujson"
+        JSONDecodeError = getattr(ujson, "JSONDecodeError", ValueError)
+        loads = ujson.loads
+
+        def dumps(obj, pretty=False):
+            return ujson.dumps(obj, indent=2 if pretty else 0).encode()
+
+    except ImportError:
+        import json
+
+        BACKEND = "json"
+        JSONDecodeError = json.JSONDecodeError
+        loads = json.loads
+
+        def dumps(obj, pretty=False):
+            if pretty:
+                return json.dumps(obj, indent=2).encode()
+            return json.dumps(obj, separators=(',', ':')).encode()
@@ -1,5 +1,4 @@
 import asyncio
-import json
 import time
 import threading
 import tkinter as tk
@@ -8,10 +7,13 @@ import logging
 import sys
 import os
 import argparse
-from collections import deque
+import queue
 
-from trade_simulator import OrderBook, TradeSimulatorUI, almgren_chriss_impact, linear_slippage_estimate, fee_estimate, maker_taker_proportion
+import numpy as np
+
+from trade_simulator import OrderBook, LatencyBuffer, TradeSimulatorUI, almgren_chriss_impact, linear_slippage_estimate, fee_estimate, maker_taker_proportion
 import config
+import _fastjson
 
 # --- Set up logging ---
 logging.basicConfig(
@@ -23,27 +25,96 @@ logging.basicConfig(
 )
 logger = logging.getLogger('OfflineSimulator')
 
+# How often the UI checks for replay progress posted by the simulator
+PROGRESS_POLL_INTERVAL = 50  # milliseconds
+
+def _split_levels(levels):
+    """Convert [[price, qty], ...] rows into float64 price and quantity arrays"""
+    if not levels:
+        empty = np.empty(0, dtype=np.float64)
+        return empty, empty
+    arr = np.asarray([row[:2] for row in levels], dtype=np.float64)
+    return arr[:, 0].copy(), arr[:, 1].copy()
+
+def _stack_rows(rows, fill):
+    """Stack 1-D arrays of possibly different lengths into one [len(rows), max_len] array"""
+    width = max((len(row) for row in rows), default=0)
+    out = np.full((len(rows), width), fill, dtype=np.float64)
+    for i, row in enumerate(rows):
+        out[i, :len(row)] = row
+    return out
+
+def _iter_samples(f):
+    """Yield raw samples from a JSON-lines file, or from a legacy single JSON array"""
+    loads = _fastjson.loads
+    first = f.read(1)
+    while first.isspace():
+        first = f.read(1)
+    f.seek(0)
+    if first == b'[':
+        yield from loads(f.read())
+    else:
+        for line in f:
+            if line.strip():
+                yield loads(line)
+
 class OfflineDataSimulator:
     """Class to simulate WebSocket connection using offline data"""
     def __init__(self, orderbook, data_file, replay_speed=1.0):
         self.orderbook = orderbook
         self.data_file = data_file
-        self.replay_speed = replay_speed
+        self.replay_speed = replay_speed  # also sets the tick period
         self.connected = False
         self.paused = False
-        self.latency = deque(maxlen=100)
+        self.latency = LatencyBuffer(100)
         self.current_index = 0
-        self.data = []
-        self.stop_event = threading.Event()
+        self.num_samples = 0
+        # Samples stored as [num_samples, depth] arrays, one row per orderbook update
+        self.ask_px = self.ask_qty = self.bid_px = self.bid_qty = np.empty((0, 0))
+        self._loop = None
+        self._replay_task = None
+        # Latest replay position for the UI; holds one value so a headless run never grows it
+        self.progress_queue = queue.Queue(maxsize=1)
+    
+    @property
+    def replay_speed(self):
+        """Replay speed multiplier (samples per second)"""
+        return self._replay_speed
+    
+    @replay_speed.setter
+    def replay_speed(self, value):
+        self._replay_speed = value
+        self._period_ns = int(1e9 / value)
     
     def load_data(self):
         """Load data from file"""
         try:
-            with open(self.data_file, 'r') as f:
-                self.data = json.load(f)
-            logger.info(f"Loaded {len(self.data)} orderbook samples from {self.data_file}")
+            # Parse price/quantity values once so replay ticks only slice arrays
+            ask_px, ask_qty, bid_px, bid_qty = [], [], [], []
+            with open(self.data_file, 'rb') as f:
+                for sample in _iter_samples(f):
+                    px, qty = _split_levels(sample.get("asks", []))
+                    ask_px.append(px)
+                    ask_qty.append(qty)
+                    px, qty = _split_levels(sample.get("bids", []))
+                    bid_px.append(px)
+                    bid_qty.append(qty)
+            
+            # Shallower samples are padded with NaN prices and zero quantities. A zero
+            # quantity only ever removes a level, and the removal is a no-op because NaN
+            # compares unequal to every key (itself included), so padding never reaches
+            # the book (see test_padded_rows_replay_cleanly)
+            self.ask_px = _stack_rows(ask_px, np.nan)
+            self.ask_qty = _stack_rows(ask_qty, 0.0)
+            self.bid_px = _stack_rows(bid_px, np.nan)
+            self.bid_qty = _stack_rows(bid_qty, 0.0)
+            self.num_samples = len(ask_px)
+            if not self.num_samples:
+                logger.error(f"No orderbook samples found in {self.data_file}")
+                return False
+            logger.info(f"Loaded {self.num_samples} orderbook samples from {self.data_file}")
             return True
-        except (json.JSONDecodeError, FileNotFoundError) as e:
+        except (ValueError, TypeError, FileNotFoundError) as e:
             logger.error(f"Error loading data file: {e}")
             return False
     
@@ -51,15 +122,35 @@ class OfflineDataSimulator:
         """Start the simulator"""
         if self.load_data():
             self.connected = True
-            self.stop_event.clear()
-            threading.Thread(target=self.replay_data, daemon=True).start()
+            # Replay runs as a coroutine on its own event loop thread, like the live client
+            loop = asyncio.new_event_loop()
+            task = loop.create_task(self.replay_data())
+            self._loop, self._replay_task = loop, task
+            # The thread gets its own loop and task, so a later start() cannot swap them out
+            threading.Thread(target=self._run_loop, args=(loop, task), daemon=True).start()
             return True
         return False
     
+    def _run_loop(self, loop, task):
+        """Drive the replay task until it finishes or is cancelled"""
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            loop.close()
+    
     def stop(self):
         """Stop the simulator"""
-        self.stop_event.set()
         self.connected = False
+        # Cancelling also interrupts a pacing sleep, so stop takes effect immediately
+        loop, task = self._loop, self._replay_task
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(task.cancel)
+            except RuntimeError:
+                pass  # the loop already closed: the replay has finished
     
     def pause(self):
         """Pause the simulator"""
@@ -69,55 +160,77 @@ class OfflineDataSimulator:
         """Resume the simulator"""
         self.paused = False
     
-    def replay_data(self):
+    async def replay_data(self):
         """Replay the data at specified speed"""
         try:
-            while not self.stop_event.is_set() and self.current_index < len(self.data):
+            # Pace ticks against a running monotonic deadline so sleep jitter does not accumulate
+            next_tick = time.monotonic_ns()
+            num_samples = self.num_samples  # data is not swapped while replaying
+            ask_px, ask_qty, bid_px, bid_qty = self.ask_px, self.ask_qty, self.bid_px, self.bid_qty
+            log_counter = 0
+            while True:
+                # If we've reached the end, start over
+                if self.current_index >= num_samples:
+                    logger.info("Reached end of data, restarting")
+                    self.current_index = 0
+                    continue
+                
                 if not self.paused:
-                    start_time = time.time()
-                    
-                    # Get next sample
-                    sample = self.data[self.current_index]
+                    start_time = time.perf_counter_ns()
                     
-                    # Update orderbook
-                    self.orderbook.update(sample.get("asks", []), sample.get("bids", []))
+                    # Update orderbook from the next sample's rows (views, no copy)
+                    i = self.current_index
+                    self.orderbook.update_arrays(ask_px[i], ask_qty[i], bid_px[i], bid_qty[i])
                     
                     # Move to next sample
                     self.current_index += 1
+                    self._publish_progress(self.current_index)
                     
                     # Calculate processing time
-                    processing_time = time.time() - start_time
+                    processing_time = (time.perf_counter_ns() - start_time) / 1e9
                     self.latency.append(processing_time)
                     
-                    # Sleep to maintain replay speed
-                    delay = (1.0 / self.replay_speed) - processing_time
-                    if delay > 0:
-                        time.sleep(delay)
+                    # Sleep until the next deadline to maintain replay speed
+                    period_ns = self._period_ns
+                    next_tick += period_ns
+                    delay_ns = next_tick - time.monotonic_ns()
+                    if delay_ns > 0:
+                        await asyncio.sleep(delay_ns / 1e9)
+                    elif delay_ns < -period_ns:
+                        # Fell more than a tick behind; resync rather than bursting to catch up
+                        next_tick = time.monotonic_ns()
                     
-                    # Log progress periodically
-                    if self.current_index % 10 == 0:
-                        logger.info(f"Processed {self.current_index}/{len(self.data)} samples")
+                    # Log progress every 10 ticks, formatting only if INFO is enabled
+                    log_counter += 1
+                    if log_counter >= 10:
+                        log_counter = 0
+                        if logger.isEnabledFor(logging.INFO):
+                            logger.info(f"Processed {self.current_index}/{num_samples} samples")
                 else:
                     # When paused, just sleep a bit
-                    time.sleep(0.1)
-            
-            # If we've reached the end, start over
-            if self.current_index >= len(self.data) and not self.stop_event.is_set():
-                logger.info("Reached end of data, restarting")
-                self.current_index = 0
-                self.replay_data()
+                    await asyncio.sleep(0.1)
+                    next_tick = time.monotonic_ns()
                 
         except Exception as e:
             logger.error(f"Error in replay_data: {e}")
             self.connected = False
     
+    def _publish_progress(self, index):
+        """Replace any position the UI has not consumed yet with the newest one"""
+        try:
+            self.progress_queue.get_nowait()
+        except queue.Empty:
+            pass
+        # This thread is the only producer, so the slot is free now
+        self.progress_queue.put_nowait(index)
+    
     def is_connected(self):
         """Return connection status"""
         return self.connected
     
     def get_average_latency(self):
         """Return average latency"""
-        return (sum(self.latency) / len(self.latency)) if self.latency else 0
+        return self.latency.mean()
 
 class OfflineSimulatorUI(TradeSimulatorUI):
     """Extended UI for offline simulator with playback controls"""
@@ -144,12 +257,12 @@ class OfflineSimulatorUI(TradeSimulatorUI):
         self.restart_button.pack(side="left", padx=5)
         
         # Add progress info
-        self.progress_var = tk.StringVar(value="0/0")
         ttk.Label(self.control_frame, text="Progress:").pack(side="left", padx=5)
-        ttk.Label(self.control_frame, textvariable=self.progress_var).pack(side="left", padx=5)
+        self.progress_label = ttk.Label(self.control_frame, text=f"{simulator.current_index}/{simulator.num_samples}")
+        self.progress_label.pack(side="left", padx=5)
         
-        # Update UI with progress information
-        self.update_ui()
+        # Update progress only when the replay thread reports movement
+        self._drain_progress()
     
     def toggle_pause(self):
         """Toggle pause/resume"""
@@ -165,28 +278,33 @@ class OfflineSimulatorUI(TradeSimulatorUI):
         """Restart the simulation from beginning"""
         simulator = self.ws_client
         simulator.current_index = 0
-        self.connection_status_var.set("Restarted simulation")
+        self._configure_label(self.progress_label, text=f"0/{simulator.num_samples}")
+        self._configure_label(self.status_label, text="Restarted simulation")
     
     def change_speed(self, value):
         """Change replay speed"""
         self.ws_client.replay_speed = float(value)
     
-    def update_ui(self):
-        """Override to add progress updates"""
-        super().update_ui()
-        
-        # Update progress
+    def _drain_progress(self):
+        """Show the latest replay position posted by the simulator, if any"""
         simulator = self.ws_client
-        if hasattr(simulator, 'current_index') and hasattr(simulator, 'data'):
-            self.progress_var.set(f"{simulator.current_index}/{len(simulator.data)}")
+        index = None
+        try:
+            # Coalesce everything posted since the last check down to the newest value
+            while True:
+                index = simulator.progress_queue.get_nowait()
+        except queue.Empty:
+            pass
+        
+        if index is not None:
+            self._configure_label(self.progress_label, text=f"{index}/{simulator.num_samples}")
         
-        # Schedule next update
-        self.root.after(config.UI_REFRESH_RATE, self.update_ui)
+        self.root.after(PROGRESS_POLL_INTERVAL, self._drain_progress)
 
 def main():
     # Parse arguments
     parser = argparse.ArgumentParser(description="Run the trade simulator with offline data")
-    parser.add_argument("--data", type=str, default="test_data.json", help="JSON file with orderbook data")
+    parser.add_argument("--data", type=str, default="test_data.json", help="Orderbook data file: JSON lines (as generated by default) or a single JSON array")
     parser.add_argument("--speed", type=float, default=1.0, help="Replay speed multiplier")
     args = parser.parse_args()
     
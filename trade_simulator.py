@@ -1,13 +1,29 @@
 import asyncio
 import websockets
-import json
+import math
 import time
-from collections import deque
+import numpy as np
+from sortedcontainers import SortedDict
 import threading
+from concurrent.futures import ThreadPoolExecutor
 import tkinter as tk
 from tkinter import ttk, messagebox
 import logging
 import sys
+import _fastjson
+try:
+    import uvloop
+except ImportError:
+    # uvloop is optional (and unavailable on Windows); use the default asyncio loop
+    uvloop = None
+try:
+    from numba import njit
+except ImportError:
+    # numba is optional; the model kernels then run as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
 try:
     import config
 except ImportError:
@@ -49,112 +65,251 @@ logger = logging.getLogger('TradeSimulator')
 
 # --- Constants ---
 WS_URL = "wss://ws.gomarket-cpp.goquant.io/ws/l2-orderbook/okx/BTC-USDT-SWAP"
+RECEIVE_QUEUE_SIZE = 256  # frames buffered between the socket reader and the parse worker
 
 # --- Orderbook Data Structure ---
+def _parse_levels(rows):
+    """
+    Parse feed rows of [price, qty, ...] strings into (price, qty) float pairs.
+    Fields are indexed rather than unpacked so the extra per-level fields OKX may
+    append (liquidated and order counts) are ignored instead of failing the message.
+    """
+    return [(float(row[0]), float(row[1])) for row in rows]
+
 class OrderBook:
     def __init__(self):
-        self.asks = {}  # price: quantity
-        self.bids = {}  # price: quantity
+        # Price-sorted so the best level is an O(1) peek instead of a scan
+        self.asks = SortedDict()  # price: quantity
+        self.bids = SortedDict()  # price: quantity
         self.lock = threading.Lock()
         self.last_update_time = 0
+        # Immutable (best_bid, best_ask, mid_price, update_time) snapshot, replaced
+        # wholesale by every update; reference assignment is atomic, so readers need no lock
+        self._tob = (None, None, None, 0)
+        self.seq = 0  # bumped by every update so readers can tell when the book changed
 
     def update(self, asks, bids):
+        """
+        Apply a feed message's levels. Parsing happens before taking the lock, and a
+        malformed row raises ValueError/TypeError to the caller without applying any
+        of the message.
+        """
+        self.update_levels(_parse_levels(asks), _parse_levels(bids))
+
+    def update_levels(self, ask_levels, bid_levels):
+        """Apply pre-parsed (price, qty) float pairs, skipping string parsing"""
+        if not ask_levels and not bid_levels:
+            # Empty delta: nothing to apply, but the feed is still alive
+            self.last_update_time = time.time()
+            return
+        self._apply(ask_levels, bid_levels)
+
+    def update_arrays(self, ask_px, ask_qty, bid_px, bid_qty):
+        """Apply pre-parsed float64 price/quantity arrays, skipping string parsing"""
+        self._apply(zip(ask_px.tolist(), ask_qty.tolist()),
+                    zip(bid_px.tolist(), bid_qty.tolist()))
+
+    def _apply(self, ask_levels, bid_levels):
+        """Apply parsed (price, qty) float pairs; a zero quantity removes the level"""
         with self.lock:
-            for price, qty in asks:
-                try:
-                    price_f = float(price)
-                    qty_f = float(qty)
-                    if qty_f == 0:
-                        self.asks.pop(price_f, None)
-                    else:
-                        self.asks[price_f] = qty_f
-                except (ValueError, TypeError) as e:
-                    logger.error(f"Error parsing ask data: {e}")
-            
-            for price, qty in bids:
-                try:
-                    price_f = float(price)
-                    qty_f = float(qty)
-                    if qty_f == 0:
-                        self.bids.pop(price_f, None)
-                    else:
-                        self.bids[price_f] = qty_f
-                except (ValueError, TypeError) as e:
-                    logger.error(f"Error parsing bid data: {e}")
-            
+            asks, bids = self.asks, self.bids
+            asks_pop, asks_set = asks.pop, asks.__setitem__
+            bids_pop, bids_set = bids.pop, bids.__setitem__
+
+            for price, qty in ask_levels:
+                if qty == 0:
+                    asks_pop(price, None)
+                else:
+                    asks_set(price, qty)
+
+            for price, qty in bid_levels:
+                if qty == 0:
+                    bids_pop(price, None)
+                else:
+                    bids_set(price, qty)
+
+            best_ask = asks.peekitem(0)[0] if asks else None
+            best_bid = bids.peekitem(-1)[0] if bids else None
+            mid_price = (best_ask + best_bid) / 2 if best_ask and best_bid else None
             self.last_update_time = time.time()
+            self._tob = (best_bid, best_ask, mid_price, self.last_update_time)
+            self.seq += 1
+
+    # Readers never take the lock: _tob is an immutable tuple and last_update_time a
+    # float, both replaced by a single (atomic) attribute assignment in the writer
+
+    def get_top_of_book(self):
+        """Return a consistent (best_bid, best_ask, mid_price, update_time) snapshot"""
+        return self._tob
 
     def get_best_ask(self):
-        with self.lock:
-            return min(self.asks.keys()) if self.asks else None
+        return self._tob[1]
 
     def get_best_bid(self):
-        with self.lock:
-            return max(self.bids.keys()) if self.bids else None
+        return self._tob[0]
 
     def get_mid_price(self):
-        best_ask = self.get_best_ask()
-        best_bid = self.get_best_bid()
-        return (best_ask + best_bid) / 2 if best_ask and best_bid else None
+        return self._tob[2]
     
     def is_stale(self, max_age_seconds=None):
         """Check if orderbook data is stale"""
         max_age = max_age_seconds or config.STALE_DATA_THRESHOLD
         return time.time() - self.last_update_time > max_age
 
+# --- Latency Tracking ---
+class LatencyBuffer:
+    """Fixed-size ring buffer of latency samples with an O(1) running mean"""
+    def __init__(self, size=100):
+        self._buf = np.zeros(size, dtype=np.float64)
+        self._size = size
+        self._idx = 0
+        self._count = 0
+        self._sum = 0.0
+
+    def append(self, value):
+        # Swap the oldest sample out of the running sum
+        self._sum += value - self._buf.item(self._idx)
+        self._buf[self._idx] = value
+        self._idx = (self._idx + 1) % self._size
+        if self._count < self._size:
+            self._count += 1
+
+    def mean(self):
+        return self._sum / self._count if self._count else 0
+
+    def __len__(self):
+        return self._count
+
 # --- Models ---
+# The arithmetic lives in small kernels; coefficients are passed in rather than
+# read as globals, since numba would freeze them at compile time. Only the combined
+# _trade_metrics_kernel is compiled: for a single multiply-add, numba's dispatch
+# overhead costs more than it saves, so the scalar wrappers call plain Python.
+
+def reload_config():
+    """Rebind the model coefficients from config (call after changing config at runtime)"""
+    global _IMPACT_GAMMA, _IMPACT_ETA, _SLIPPAGE_SLOPE, _SLIPPAGE_INTERCEPT
+    global _DEFAULT_FEE_TIER, _MAKER_TAKER_COEFFICIENT, _MAKER_TAKER_MIDPOINT
+    _IMPACT_GAMMA = config.IMPACT_GAMMA
+    _IMPACT_ETA = config.IMPACT_ETA
+    _SLIPPAGE_SLOPE = config.SLIPPAGE_SLOPE
+    _SLIPPAGE_INTERCEPT = config.SLIPPAGE_INTERCEPT
+    _DEFAULT_FEE_TIER = config.DEFAULT_FEE_TIER
+    _MAKER_TAKER_COEFFICIENT = config.MAKER_TAKER_COEFFICIENT
+    _MAKER_TAKER_MIDPOINT = config.MAKER_TAKER_MIDPOINT
+
+# Bind coefficients as module globals so the hot path skips config attribute lookups
+reload_config()
+
+def _almgren_chriss_kernel(order_size, volatility, time_horizon, gamma, eta):
+    return gamma * order_size + eta * order_size * volatility * time_horizon
+
+def _linear_slippage_kernel(order_size, volatility, slope, intercept):
+    return intercept + slope * order_size * volatility
+
+def _fee_kernel(order_size, fee):
+    return order_size * fee
+
+def _maker_taker_kernel(order_size, coef, midpoint):
+    return 1 / (1 + math.exp(-coef * (order_size - midpoint)))
+
+# Compiled copies for _trade_metrics_kernel to call (the same functions without numba)
+_almgren_chriss_jit = njit(cache=True)(_almgren_chriss_kernel)
+_linear_slippage_jit = njit(cache=True)(_linear_slippage_kernel)
+_fee_jit = njit(cache=True)(_fee_kernel)
+_maker_taker_jit = njit(cache=True)(_maker_taker_kernel)
 
 def almgren_chriss_impact(order_size, volatility, time_horizon=1.0, risk_aversion=0.1):
     try:
-        gamma = config.IMPACT_GAMMA
-        eta = config.IMPACT_ETA
-        impact = gamma * order_size + eta * order_size * volatility * time_horizon
-        return impact
+        return _almgren_chriss_kernel(order_size, volatility, time_horizon,
+                                      _IMPACT_GAMMA, _IMPACT_ETA)
     except Exception as e:
         logger.error(f"Error calculating Almgren-Chriss impact: {e}")
         return 0.0
 
 def linear_slippage_estimate(order_size, volatility):
     try:
-        slope = config.SLIPPAGE_SLOPE
-        intercept = config.SLIPPAGE_INTERCEPT
-        slippage = intercept + slope * order_size * volatility
-        return slippage
+        return _linear_slippage_kernel(order_size, volatility,
+                                       _SLIPPAGE_SLOPE, _SLIPPAGE_INTERCEPT)
     except Exception as e:
         logger.error(f"Error calculating slippage: {e}")
         return 0.0
 
 def fee_estimate(order_size, fee_tier=None):
     try:
-        fee = fee_tier or config.DEFAULT_FEE_TIER
-        return order_size * fee
+        fee = fee_tier or _DEFAULT_FEE_TIER
+        return _fee_kernel(order_size, fee)
     except Exception as e:
         logger.error(f"Error calculating fees: {e}")
         return 0.0
 
 def maker_taker_proportion(order_size):
     try:
-        import math
-        coef = config.MAKER_TAKER_COEFFICIENT
-        midpoint = config.MAKER_TAKER_MIDPOINT
-        return 1 / (1 + math.exp(-coef * (order_size - midpoint)))
+        return _maker_taker_kernel(order_size, _MAKER_TAKER_COEFFICIENT,
+                                   _MAKER_TAKER_MIDPOINT)
     except Exception as e:
         logger.error(f"Error calculating maker/taker proportion: {e}")
         return 0.5
 
+@njit(cache=True)
+def _trade_metrics_kernel(order_size, volatility, time_horizon, fee, gamma, eta, slope, intercept, coef, midpoint):
+    # Built from the per-model kernels so each formula is defined once
+    slippage = _linear_slippage_jit(order_size, volatility, slope, intercept)
+    fees = _fee_jit(order_size, fee)
+    impact = _almgren_chriss_jit(order_size, volatility, time_horizon, gamma, eta)
+    maker_taker = _maker_taker_jit(order_size, coef, midpoint)
+    return slippage, fees, impact, slippage + fees + impact, maker_taker
+
+def compute_trade_metrics(order_size, volatility, fee_tier=None, time_horizon=1.0):
+    """
+    Evaluate every cost model in one call
+    
+    Returns:
+        tuple: (slippage, fees, market_impact, net_cost, maker_taker_proportion)
+    """
+    try:
+        return _trade_metrics_kernel(order_size, volatility, time_horizon, fee_tier or _DEFAULT_FEE_TIER,
+                                     _IMPACT_GAMMA, _IMPACT_ETA, _SLIPPAGE_SLOPE, _SLIPPAGE_INTERCEPT,
+                                     _MAKER_TAKER_COEFFICIENT, _MAKER_TAKER_MIDPOINT)
+    except Exception:
+        # Out-of-range input (e.g. exp overflow); the individual models log and fall back
+        slippage = linear_slippage_estimate(order_size, volatility)
+        fees = fee_estimate(order_size, fee_tier)
+        impact = almgren_chriss_impact(order_size, volatility, time_horizon)
+        return slippage, fees, impact, slippage + fees + impact, maker_taker_proportion(order_size)
+
+# --- Vectorized Models ---
+# Evaluate a cost curve over an array of order sizes in one call, e.g. for sweeps.
+
+def almgren_chriss_impact_vec(sizes, volatility, time_horizon=1.0):
+    sizes = np.asarray(sizes, dtype=np.float64)
+    return _IMPACT_GAMMA * sizes + _IMPACT_ETA * sizes * volatility * time_horizon
+
+def linear_slippage_estimate_vec(sizes, volatility):
+    sizes = np.asarray(sizes, dtype=np.float64)
+    return _SLIPPAGE_INTERCEPT + _SLIPPAGE_SLOPE * sizes * volatility
+
+def maker_taker_proportion_vec(sizes):
+    sizes = np.asarray(sizes, dtype=np.float64)
+    return 1 / (1 + np.exp(-_MAKER_TAKER_COEFFICIENT * (sizes - _MAKER_TAKER_MIDPOINT)))
+
 # --- WebSocket Client ---
 class OKXWebSocketClient:
     def __init__(self, url, orderbook):
         self.url = url
         self.orderbook = orderbook
         self.ws = None
-        self.latency = deque(maxlen=100)
+        self.latency = LatencyBuffer(100)
         self.connected = False
         self.reconnect_attempts = 0
         self.max_reconnect_attempts = config.MAX_RECONNECT_ATTEMPTS
-        self.reconnect_delay = config.INITIAL_RECONNECT_DELAY
+        # Reconnect delay per consecutive failure, growing 1.5x up to the configured cap
+        self._backoff = tuple(min(config.MAX_RECONNECT_DELAY, config.INITIAL_RECONNECT_DELAY * 1.5 ** i)
+                              for i in range(20))
         self.running = True
         self.connect_lock = threading.Lock()
+        # One worker parses and applies messages in arrival order, off the event loop
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="okx-parse")
 
     async def connect(self):
         while self.running:
@@ -167,11 +322,12 @@ class OKXWebSocketClient:
                             ping_interval=config.PING_INTERVAL,
                             ping_timeout=60,  # Increased ping timeout
                             close_timeout=10,
-                            max_size=10_000_000  # Increased message size limit
+                            max_size=10_000_000,  # Increased message size limit
+                            max_queue=32,  # Bound frames buffered ahead of the receive loop
+                            compression=None  # Skip per-message deflate on every frame
                         )
                         self.connected = True
                         self.reconnect_attempts = 0
-                        self.reconnect_delay = config.INITIAL_RECONNECT_DELAY
                         logger.info("WebSocket connected")
                         await self.subscribe()
                         await self.receive()
@@ -179,24 +335,28 @@ class OKXWebSocketClient:
                 self.connected = False
                 self.reconnect_attempts += 1
                 logger.error(f"WebSocket connection error: {e}, attempt {self.reconnect_attempts}")
-                await asyncio.sleep(self.reconnect_delay)
-                self.reconnect_delay = min(config.MAX_RECONNECT_DELAY, self.reconnect_delay * 1.5)
+                await asyncio.sleep(self._reconnect_delay())
             except Exception as e:
                 self.connected = False
+                self.reconnect_attempts += 1
                 logger.error(f"Unexpected connection error: {e}")
-                await asyncio.sleep(self.reconnect_delay)
-                self.reconnect_delay = min(config.MAX_RECONNECT_DELAY, self.reconnect_delay * 1.5)
+                await asyncio.sleep(self._reconnect_delay())
             finally:
                 # Always try to reconnect, don't give up after max_reconnect_attempts
                 await asyncio.sleep(1)
 
+    def _reconnect_delay(self):
+        """Backoff delay for the current run of failed attempts"""
+        return self._backoff[min(self.reconnect_attempts - 1, len(self._backoff) - 1)]
+
     async def subscribe(self):
         try:
             sub_msg = {
                 "op": "subscribe",
                 "args": [{"channel": "l2-orderbook", "instId": config.DEFAULT_ASSET}]
             }
-            await self.ws.send(json.dumps(sub_msg))
+            # Decode so the request still goes out as a text frame
+            await self.ws.send(_fastjson.dumps(sub_msg).decode())
             logger.info("Subscribed to orderbook channel")
         except Exception as e:
             logger.error(f"Subscription error: {e}")
@@ -204,32 +364,67 @@ class OKXWebSocketClient:
             raise
 
     async def receive(self):
+        # The read loop only enqueues frames so the selector is never held up by parsing
+        queue = asyncio.Queue(maxsize=RECEIVE_QUEUE_SIZE)
+        consumer = asyncio.create_task(self._consume(queue))
         try:
             async for message in self.ws:
-                start_time = time.time()
-                try:
-                    data = json.loads(message)
-                    if "asks" in data and "bids" in data:
-                        self.orderbook.update(data["asks"], data["bids"])
-                except json.JSONDecodeError as e:
-                    logger.error(f"JSON decode error: {e}")
-                except Exception as e:
-                    logger.error(f"Error processing message: {e}")
-                end_time = time.time()
-                self.latency.append(end_time - start_time)
+                await queue.put(message)
         except Exception as e:
             logger.error(f"WebSocket receive error: {e}")
             self.connected = False
             raise
+        finally:
+            consumer.cancel()
+
+    async def _consume(self, queue):
+        """Hand queued messages to the parse worker in batches, preserving order"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            # Take everything that arrived while the previous batch was being applied
+            while True:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            await loop.run_in_executor(self._executor, self._parse_and_apply, batch)
+
+    def _parse_and_apply(self, messages):
+        """
+        Parse a batch of messages and apply them to the orderbook in one update
+        (runs on the parse worker). Levels are merged by price so only the latest
+        quantity per level is applied; a malformed message is dropped on its own.
+        """
+        start_time = time.perf_counter_ns()
+        asks, bids = {}, {}
+        received = False
+        for message in messages:
+            try:
+                data = _fastjson.loads(message)
+                if "asks" in data and "bids" in data:
+                    ask_levels = _parse_levels(data["asks"])
+                    bid_levels = _parse_levels(data["bids"])
+                    asks.update(ask_levels)
+                    bids.update(bid_levels)
+                    received = True
+            except _fastjson.JSONDecodeError as e:
+                logger.error(f"JSON decode error: {e}")
+            except Exception as e:
+                logger.error(f"Error processing message: {e}")
+        if received:
+            self.orderbook.update_levels(asks.items(), bids.items())
+        self.latency.append((time.perf_counter_ns() - start_time) / 1e9)
 
     def get_average_latency(self):
-        return (sum(self.latency) / len(self.latency)) if self.latency else 0
+        return self.latency.mean()
 
     def is_connected(self):
         return self.connected
         
     def shutdown(self):
         self.running = False
+        self._executor.shutdown(wait=False)
 
 # --- UI ---
 class TradeSimulatorUI:
@@ -254,9 +449,9 @@ class TradeSimulatorUI:
         # Status frame at the bottom
         self.status_frame = ttk.Frame(root, padding="5")
         self.status_frame.grid(row=1, column=0, columnspan=2, sticky="ew")
-        self.connection_status_var = tk.StringVar(value="Connecting...")
-        self.status_label = ttk.Label(self.status_frame, textvariable=self.connection_status_var)
+        self.status_label = ttk.Label(self.status_frame, text="Connecting...")
         self.status_label.pack(side="left")
+        self._label_options = {}  # last options applied per label, see _configure_label
 
         # Input Panel
         ttk.Label(self.left_frame, text="Input Parameters", font=('Helvetica', 12, 'bold')).grid(row=0, column=0, columnspan=2, pady=10)
@@ -323,6 +518,25 @@ class TradeSimulatorUI:
             ttk.Label(self.right_frame, text=label).grid(row=i+1, column=0, sticky="w", pady=5)
             ttk.Label(self.right_frame, textvariable=var).grid(row=i+1, column=1, sticky="w", pady=5)
 
+        # Output variables by key, and the text last written to each
+        self._vars = {
+            "best_bid": self.best_bid_var,
+            "best_ask": self.best_ask_var,
+            "mid_price": self.mid_price_var,
+            "slippage": self.slippage_var,
+            "fees": self.fees_var,
+            "market_impact": self.market_impact_var,
+            "net_cost": self.net_cost_var,
+            "maker_taker": self.maker_taker_var,
+            "latency": self.latency_var,
+        }
+        self._var_text = {}
+        self._pending = {}  # formatted values waiting for the idle-time write, see _apply_pending
+
+        # Book sequence and model inputs last drawn; update_ui skips redraws when unchanged
+        self._last_seq = None
+        self._last_inputs = None
+
         # Start UI update
         self.update_ui()
         
@@ -333,44 +547,50 @@ class TradeSimulatorUI:
         try:
             # Update connection status
             if self.ws_client.is_connected():
-                self.connection_status_var.set("Connected to OKX")
-                self.status_label.config(foreground="green")
+                status, colour = "Connected to OKX", "green"
             else:
-                self.connection_status_var.set("Disconnected from OKX")
-                self.status_label.config(foreground="red")
-            
-            # Update orderbook info
-            best_bid = self.orderbook.get_best_bid()
-            best_ask = self.orderbook.get_best_ask()
-            mid_price = self.orderbook.get_mid_price()
-            
-            self.best_bid_var.set(f"{best_bid:.2f}" if best_bid else "N/A")
-            self.best_ask_var.set(f"{best_ask:.2f}" if best_ask else "N/A")
-            self.mid_price_var.set(f"{mid_price:.2f}" if mid_price else "N/A")
+                status, colour = "Disconnected from OKX", "red"
             
             # Check if orderbook is stale
             if self.orderbook.is_stale():
-                self.status_label.config(foreground="orange")
-                self.connection_status_var.set("Warning: Orderbook data is stale")
+                status, colour = "Warning: Orderbook data is stale", "orange"
+            self._configure_label(self.status_label, text=status, foreground=colour)
+            
+            # Format everything that changed first, then write the variables in one pass
+            values = {}
+            
+            # Update orderbook info and latency only when new market data arrived
+            seq = self.orderbook.seq
+            if seq != self._last_seq:
+                best_bid, best_ask, mid_price, _ = self.orderbook.get_top_of_book()
+                latency = self.ws_client.get_average_latency() * 1000 if self.ws_client else 0
+                
+                values["best_bid"] = f"{best_bid:.2f}" if best_bid else "N/A"
+                values["best_ask"] = f"{best_ask:.2f}" if best_ask else "N/A"
+                values["mid_price"] = f"{mid_price:.2f}" if mid_price else "N/A"
+                values["latency"] = f"{latency:.2f}"
+            
+            # Update trade metrics only when the inputs changed
+            inputs = (self.quantity_var.get(), self.volatility_var.get(), self.fee_tier_var.get())
+            if inputs != self._last_inputs:
+                slippage, fees, market_impact, net_cost, maker_taker = compute_trade_metrics(*inputs)
+                
+                values["slippage"] = f"{slippage:.6f}"
+                values["fees"] = f"{fees:.6f}"
+                values["market_impact"] = f"{market_impact:.6f}"
+                values["net_cost"] = f"{net_cost:.6f}"
+                values["maker_taker"] = f"{maker_taker:.4f}"
             
-            # Update trade metrics
-            quantity = self.quantity_var.get()
-            volatility = self.volatility_var.get()
-            fee_tier = self.fee_tier_var.get()
-
-            slippage = linear_slippage_estimate(quantity, volatility)
-            fees = fee_estimate(quantity, fee_tier)
-            market_impact = almgren_chriss_impact(quantity, volatility)
-            net_cost = slippage + fees + market_impact
-            maker_taker = maker_taker_proportion(quantity)
-            latency = self.ws_client.get_average_latency() * 1000 if self.ws_client else 0
-
-            self.slippage_var.set(f"{slippage:.6f}")
-            self.fees_var.set(f"{fees:.6f}")
-            self.market_impact_var.set(f"{market_impact:.6f}")
-            self.net_cost_var.set(f"{net_cost:.6f}")
-            self.maker_taker_var.set(f"{maker_taker:.4f}")
-            self.latency_var.set(f"{latency:.2f}")
+            # Defer the writes to one idle callback so Tk batches the redraw
+            if values:
+                schedule = not self._pending
+                self._pending.update(values)
+                if schedule:
+                    self.root.after_idle(self._apply_pending)
+            
+            # Only now mark this state as drawn, so a failure above is retried next tick
+            self._last_seq = seq
+            self._last_inputs = inputs
             
         except Exception as e:
             logger.error(f"Error updating UI: {e}")
@@ -378,37 +598,52 @@ class TradeSimulatorUI:
             # Schedule next update
             self.root.after(config.UI_REFRESH_RATE, self.update_ui)
     
+    def _apply_pending(self):
+        """Write all values queued by update_ui since the last idle callback"""
+        pending, self._pending = self._pending, {}
+        self._set_vars(pending)
+
+    def _set_vars(self, values):
+        """Write formatted values to their StringVars, skipping text that is unchanged"""
+        for key, text in values.items():
+            if self._var_text.get(key) != text:
+                self._vars[key].set(text)
+                self._var_text[key] = text
+
+    def _configure_label(self, label, **options):
+        """Reconfigure a label only when its options changed, skipping redundant Tcl calls"""
+        if self._label_options.get(label) != options:
+            label.configure(**options)
+            self._label_options[label] = options
+
     def on_closing(self):
         if messagebox.askokcancel("Quit", "Do you want to quit the application?"):
             logger.info("Application closing")
             self.root.destroy()
             sys.exit(0)
 
-def start_ws_client(orderbook, ws_client_holder):
+def start_ws_client(orderbook, ws_client_holder, ready=None):
     try:
-        loop = asyncio.new_event_loop()
+        # libuv-backed loop cuts per-message scheduling overhead when available
+        loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         client = OKXWebSocketClient(config.WS_URL, orderbook)
         ws_client_holder.append(client)
+        if ready is not None:
+            ready.set()  # lets main() build the UI as soon as the client exists
         loop.run_until_complete(client.connect())
     except Exception as e:
         logger.error(f"Error in WebSocket client thread: {e}")
-    finally:
-        # Keep the thread alive, never exit
-        while True:
-            try:
-                time.sleep(1)
-            except:
-                break
 
 def main():
     try:
         logger.info("Starting Trade Simulator")
         orderbook = OrderBook()
         ws_client_holder = []
+        ws_ready = threading.Event()
 
         # Start WebSocket client in a separate thread
-        ws_thread = threading.Thread(target=start_ws_client, args=(orderbook, ws_client_holder), daemon=True)
+        ws_thread = threading.Thread(target=start_ws_client, args=(orderbook, ws_client_holder, ws_ready), daemon=True)
         ws_thread.start()
 
         # Create a placeholder client in case the WebSocket connection fails
@@ -418,8 +653,8 @@ def main():
             'shutdown': lambda: None
         })
 
-        # Wait briefly for WebSocket client initialization, but proceed with UI anyway
-        time.sleep(2)  # Reduced timeout to make UI appear faster
+        # Wait for WebSocket client initialization, but proceed with UI anyway after 2s
+        ws_ready.wait(timeout=2.0)
         
         ws_client = ws_client_holder[0] if ws_client_holder else placeholder_client
         